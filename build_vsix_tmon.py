@@ -6,17 +6,75 @@ This script automates the process of building and packaging the extension.
 
 import subprocess
 import sys
+import concurrent.futures
+import contextlib
+import copy
+import hashlib
 import os
 import shutil
-import platform
 import json
-import argparse
+import re
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(data) -> bytes:
+        return (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
 # Detect Windows and add .cmd extension to commands if needed
-IS_WINDOWS = platform.system() == "Windows"
-PACKAGE_JSON_PATH = Path(__file__).parent / "package.json"
+IS_WINDOWS = sys.platform == "win32"
+SCRIPT_DIR = Path(__file__).parent
+PACKAGE_JSON_PATH = SCRIPT_DIR / "package.json"
+PACKAGE_LOCK_PATH = SCRIPT_DIR / "package-lock.json"
+README_PATH = SCRIPT_DIR / "README.md"
+INSTALL_STAMP_PATH = SCRIPT_DIR / "node_modules" / ".install-stamp"
+# package.json fields that determine what npm installs
+_DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies", "overrides")
+# Cap on concurrently running build commands (set to 1 to build serially)
+MAX_PARALLEL_ENV = "VSIX_BUILD_MAX_PARALLEL"
+# Version badge in README.md: [![Version](https://img.shields.io/badge/version-X.Y.Z-blue.svg)
+_VERSION_BADGE_RE = re.compile(r"(!\[Version\]\(https://img\.shields\.io/badge/version-)[\d.]+(-blue\.svg\))")
+
+# Parsed package.json keyed by its mtime, so repeated lookups skip the disk
+_PKG_CACHE: dict = {}
+
+
+def _load_package_json() -> dict:
+    """Load package.json, reusing the cached parse while the file is unchanged."""
+    key = PACKAGE_JSON_PATH.stat().st_mtime_ns
+    if _PKG_CACHE.get("key") == key:
+        return copy.deepcopy(_PKG_CACHE["data"])
+    data = _loads(PACKAGE_JSON_PATH.read_bytes())
+    _PKG_CACHE.update(key=key, data=data)
+    return copy.deepcopy(data)
+
+
+def _atomic_write_json(path: Path, data: dict) -> None:
+    """Serialize JSON once and atomically replace the target file."""
+    # Replace the symlink target rather than the link, keeping the file's mode
+    target = path.resolve()
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    try:
+        tmp.write_bytes(_dumps(data))
+        if target.exists():
+            shutil.copymode(target, tmp)
+        os.replace(tmp, target)
+    finally:
+        if path == PACKAGE_JSON_PATH:
+            _PKG_CACHE.clear()
+        if tmp.exists():
+            tmp.unlink()
 
 
 def get_command(cmd):
@@ -28,70 +86,182 @@ def get_command(cmd):
     return cmd
 
 
-def run_command(cmd, description, shell=True):
-    """Run a command and handle errors."""
+def _print_banner(description):
+    """Print the section banner shown before each build command."""
     print(f"\n{'=' * 60}")
     print(f"⚙️  {description}")
     print(f"{'=' * 60}")
 
+
+def _report_failure(description, cmd):
+    """Print the error details for a failed build command."""
+    print(f"❌ Error: {description} failed")
+    print(f"Command: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
+
+
+def _spawn(cmd, shell=False, env=None):
+    """Start a command with stderr merged into a line-buffered stdout pipe."""
+    return subprocess.Popen(
+        cmd,
+        shell=shell,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        cwd=Path(__file__).parent,
+        env=env,
+    )
+
+
+def run_command(cmd, description, shell=None, env=None):
+    """Run a command and handle errors."""
+    # Only spawn a shell for string commands unless the caller says otherwise
+    if shell is None:
+        shell = isinstance(cmd, str)
+
+    _print_banner(description)
+
     cmd = get_command(cmd)
 
-    try:
-        result = subprocess.run(
-            cmd,
-            shell=shell,
-            check=True,
-            capture_output=True,
-            text=True,
-            cwd=Path(__file__).parent,
-        )
-        if result.stdout:
-            print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error: {description} failed")
-        print(f"Command: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
-        if e.stdout:
-            print(f"Output: {e.stdout}")
-        if e.stderr:
-            print(f"Error: {e.stderr}")
+    # Stream output as it arrives instead of buffering it all in memory
+    process = _spawn(cmd, shell=shell, env=env)
+    for line in process.stdout:
+        print(line, end="")
+    process.wait()
+
+    if process.returncode != 0:
+        _report_failure(description, cmd)
         return False
+    return True
+
+
+def _stream_labelled(label, process):
+    """Print a process's output line by line, prefixed with its label."""
+    for line in process.stdout:
+        sys.stdout.write(f"  [{label}] {line.rstrip()}\n")
+    return process.wait()
+
+
+def run_commands_parallel(commands, description):
+    """Run several independent commands concurrently and handle errors."""
+    _print_banner(description)
+
+    try:
+        max_parallel = max(1, int(os.environ.get(MAX_PARALLEL_ENV, len(commands))))
+    except ValueError:
+        print(f"⚠️  Ignoring invalid {MAX_PARALLEL_ENV} value")
+        max_parallel = len(commands)
+
+    success = True
+    for start in range(0, len(commands), max_parallel):
+        batch = commands[start : start + max_parallel]
+        running = []
+        for cmd, label in batch:
+            cmd = get_command(cmd)
+            print(f"  ▶ {label}")
+            try:
+                running.append((cmd, label, _spawn(cmd)))
+            except FileNotFoundError as exc:
+                print(f"❌ Error: {label} failed to start: {exc}")
+                success = False
+
+        # Drain every pipe on its own thread so no process stalls on a full buffer
+        if running:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(running)) as executor:
+                futures = [executor.submit(_stream_labelled, label, proc) for _, label, proc in running]
+                returncodes = [future.result() for future in futures]
+
+            for (cmd, label, _), returncode in zip(running, returncodes):
+                if returncode != 0:
+                    _report_failure(label, cmd)
+                    success = False
+
+        if not success:
+            break
+
+    return success
+
+
+def _fast_run(argv):
+    """Run a short command capturing its output, via posix_spawn where the platform allows."""
+    if IS_WINDOWS:
+        return subprocess.run(argv, capture_output=True, text=True, check=True)
+
+    executable = shutil.which(argv[0])
+    if executable is None:
+        raise FileNotFoundError(f"{argv[0]} not found in PATH")
+    # subprocess only takes its posix_spawn fast path for a resolved executable
+    # path with close_fds=False and no cwd; our fds are non-inheritable anyway.
+    return subprocess.run([executable, *argv[1:]], capture_output=True, text=True, check=True, close_fds=False)
+
+
+def _probe(cmd):
+    """Run a version probe and return (ok, stdout_or_err)."""
+    try:
+        result = _fast_run(cmd)
+        return True, result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError) as exc:
+        return False, str(exc)
 
 
 def check_prerequisites():
     """Check if required tools are installed."""
     print("\n🔍 Checking prerequisites...")
 
+    # Probe node, npm and vsce concurrently (with .cmd extension on Windows)
+    npm_cmd = "npm.cmd" if IS_WINDOWS else "npm"
+    vsce_cmd = "vsce.cmd" if IS_WINDOWS else "vsce"
+    probes = [
+        ("node", ["node", "--version"]),
+        ("npm", [npm_cmd, "--version"]),
+        ("vsce", [vsce_cmd, "--version"]),
+    ]
+
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {executor.submit(_probe, cmd): name for name, cmd in probes}
+        for future in concurrent.futures.as_completed(futures):
+            results[futures[future]] = future.result()
+
     # Check Node.js
-    try:
-        result = subprocess.run(["node", "--version"], capture_output=True, text=True, check=True)
-        print(f"✅ Node.js: {result.stdout.strip()}")
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    ok, output = results["node"]
+    if not ok:
         print("❌ Node.js is not installed or not in PATH")
         return False
+    print(f"✅ Node.js: {output}")
 
-    # Check npm (with .cmd extension on Windows)
-    npm_cmd = "npm.cmd" if IS_WINDOWS else "npm"
-    try:
-        result = subprocess.run([npm_cmd, "--version"], capture_output=True, text=True, check=True)
-        print(f"✅ npm: {result.stdout.strip()}")
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Check npm
+    ok, output = results["npm"]
+    if not ok:
         print("❌ npm is not installed or not in PATH")
         return False
+    print(f"✅ npm: {output}")
 
-    # Check if vsce is installed (with .cmd extension on Windows)
-    vsce_cmd = "vsce.cmd" if IS_WINDOWS else "vsce"
-    try:
-        result = subprocess.run([vsce_cmd, "--version"], capture_output=True, text=True, check=True)
-        print(f"✅ vsce: {result.stdout.strip()}")
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Check if vsce is installed
+    ok, output = results["vsce"]
+    if ok:
+        print(f"✅ vsce: {output}")
+    else:
         print("⚠️  vsce is not installed. Installing globally...")
-        if not run_command(["npm", "install", "-g", "@vscode/vsce"], "Installing vsce", shell=False):
+        if not run_command(["npm", "install", "-g", "@vscode/vsce"], "Installing vsce"):
             return False
 
     return True
 
 
+def _remove_dirs(dir_names) -> None:
+    """Remove the given directories concurrently, ignoring errors."""
+    existing_dirs = [Path(d) for d in dir_names if Path(d).exists()]
+    for dir_path in existing_dirs:
+        print(f"  Removing {dir_path.as_posix()}/")
+
+    if existing_dirs:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(existing_dirs)) as executor:
+            futures = [executor.submit(shutil.rmtree, d, ignore_errors=True) for d in existing_dirs]
+            for future in futures:
+                future.result()
+
+
 def clean_build():
     """Clean previous build artifacts."""
     print("\n🧹 Cleaning build artifacts...")
@@ -104,59 +274,72 @@ def clean_build():
         "node_modules/.cache",
     ]
 
-    for dir_name in dirs_to_clean:
-        dir_path = Path(dir_name)
-        if dir_path.exists():
-            print(f"  Removing {dir_name}/")
-            shutil.rmtree(dir_path, ignore_errors=True)
+    _remove_dirs(dirs_to_clean)
 
     print("✅ Cleanup complete")
     return True
 
 
-def get_version():
-    """Read version from package.json file."""
-    try:
-        with open(PACKAGE_JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        version = data.get("version", "0.0.0")
-        return str(version).strip() or "0.0.0"
-    except FileNotFoundError:
-        print("⚠️  package.json file not found, using default version")
-        return "0.0.0"
-    except (TypeError, ValueError) as exc:  # JSON errors
-        print(f"⚠️  Invalid package.json format ({exc}), using default version")
-        return "0.0.0"
+def _update_readme(new_version: str) -> bool:
+    """Update the README.md version badge, returning whether the file was rewritten."""
+    if not README_PATH.exists():
+        return False
+
+    with open(README_PATH, "r", encoding="utf-8") as f:
+        readme_content = f.read()
+
+    # Replace version in the badge, rewriting the file only if it changed
+    new_content, count = _VERSION_BADGE_RE.subn(rf"\g<1>{new_version}\g<2>", readme_content)
+    if not count or new_content == readme_content:
+        return False
+    with open(README_PATH, "w", encoding="utf-8") as f:
+        f.write(new_content)
+    return True
+
+
+def _update_lockfile_version(new_version: str) -> bool:
+    """Mirror the package version into package-lock.json, since npm ci never rewrites it."""
+    if not PACKAGE_LOCK_PATH.exists():
+        return False
+
+    lock_data = _loads(PACKAGE_LOCK_PATH.read_bytes())
+    root_package = lock_data.get("packages", {}).get("")
+    if lock_data.get("version") == new_version and (root_package is None or root_package.get("version") == new_version):
+        return False
+    lock_data["version"] = new_version
+    if root_package is not None:
+        root_package["version"] = new_version
+    _atomic_write_json(PACKAGE_LOCK_PATH, lock_data)
+    return True
 
 
 def prompt_version_update():
-    """Optionally bump the extension version before building."""
+    """Optionally bump the extension version before building, returning (ok, version)."""
     if not PACKAGE_JSON_PATH.exists():
         print("\n⚠️  package.json not found, skipping version update prompt")
-        return True
+        return True, "0.0.0"
 
     try:
-        with open(PACKAGE_JSON_PATH, "r", encoding="utf-8") as f:
-            package_data = json.load(f)
+        package_data = _load_package_json()
     except Exception as exc:
         print(f"\n❌ Unable to read package.json: {exc}")
-        return False
+        return False, "0.0.0"
 
-    version = package_data.get("version")
+    version = str(package_data.get("version") or "").strip()
     if not version:
         print("\n⚠️  package.json is missing a 'version' field, skipping version update prompt")
-        return True
+        return True, "0.0.0"
 
     print(f"\n📌 Current version: {version}")
     response = input("Would you like to update the version before building? [Y/n]: ").strip().lower()
     if response in ("n", "no"):
-        return True
+        return True, version
 
     try:
         major, minor, patch = [int(part) for part in version.split(".")]
     except ValueError:
         print("⚠️  Unable to parse semantic version. Skipping version update.")
-        return True
+        return True, version
 
     # Show what each option will do
     print("\nSelect version increment:")
@@ -185,62 +368,132 @@ def prompt_version_update():
     new_version = f"{major}.{minor}.{patch}"
     package_data["version"] = new_version
 
+    # Snapshot the files that follow package.json so a failed bump can restore them
+    originals = {path: path.read_bytes() for path in (PACKAGE_LOCK_PATH, README_PATH) if path.exists()}
+
+    # package.json, package-lock.json and README.md are independent files, so write them concurrently
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        package_future = executor.submit(_atomic_write_json, PACKAGE_JSON_PATH, package_data)
+        lock_future = executor.submit(_update_lockfile_version, new_version)
+        readme_future = executor.submit(_update_readme, new_version)
+
     try:
-        with open(PACKAGE_JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump(package_data, f, indent=2, ensure_ascii=False)
-            f.write("\n")
+        package_future.result()
     except Exception as exc:
         print(f"❌ Failed to write updated version to package.json: {exc}")
-        return False
+        # Restore the lockfile and README to their contents from before the bump
+        for path, future in ((PACKAGE_LOCK_PATH, lock_future), (README_PATH, readme_future)):
+            if future.exception() is None and not future.result():
+                continue
+            try:
+                path.write_bytes(originals[path])
+            except Exception as revert_exc:
+                print(f"⚠️  Warning: Failed to restore {path.name}: {revert_exc}")
+        return False, version
 
-    # Update version in README.md
-    readme_path = Path(__file__).parent / "README.md"
     try:
-        if readme_path.exists():
-            with open(readme_path, "r", encoding="utf-8") as f:
-                readme_content = f.read()
-
-            # Replace version in the badge: [![Version](https://img.shields.io/badge/version-X.Y.Z-blue.svg)
-            import re
-
-            readme_content = re.sub(
-                r"(!\[Version\]\(https://img\.shields\.io/badge/version-)[\d.]+(-blue\.svg\))",
-                rf"\g<1>{new_version}\g<2>",
-                readme_content,
-            )
+        if lock_future.result():
+            print(f"✅ package-lock.json version updated to {new_version}")
+    except Exception as exc:
+        print(f"⚠️  Warning: Failed to update version in package-lock.json: {exc}")
 
-            with open(readme_path, "w", encoding="utf-8") as f:
-                f.write(readme_content)
+    try:
+        if readme_future.result():
             print(f"✅ README.md version badge updated to {new_version}")
     except Exception as exc:
         print(f"⚠️  Warning: Failed to update version in README.md: {exc}")
         # Don't fail the entire build if README update fails
 
     print(f"✅ Version updated: {version} → {new_version}")
-    return True
+    return True, new_version
+
+
+def _deps_hash() -> str:
+    """Hash the dependency-related parts of package.json and package-lock.json."""
+    try:
+        package_data = _load_package_json()
+    except (OSError, ValueError):
+        package_data = {}
+    deps = {field: package_data.get(field) for field in _DEPENDENCY_FIELDS}
+
+    # The lockfile mirrors the package version, which must not invalidate the stamp
+    lock_data = None
+    if PACKAGE_LOCK_PATH.exists():
+        try:
+            lock_data = _loads(PACKAGE_LOCK_PATH.read_bytes())
+        except ValueError:
+            lock_data = PACKAGE_LOCK_PATH.read_bytes().hex()
+    if isinstance(lock_data, dict):
+        lock_data.pop("version", None)
+        root_package = lock_data.get("packages", {}).get("")
+        if isinstance(root_package, dict):
+            root_package.pop("version", None)
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([deps, lock_data], sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _npm_env() -> dict:
+    """Environment for npm installs that favours the local cache and quiet output."""
+    env = os.environ.copy()
+    env["NPM_CONFIG_PREFER_OFFLINE"] = "true"
+    env["NPM_CONFIG_AUDIT"] = "false"
+    env["NPM_CONFIG_FUND"] = "false"
+    env["NPM_CONFIG_PROGRESS"] = "false"
+    return env
 
 
 def install_dependencies():
-    """Install npm dependencies."""
-    return run_command(["npm", "install"], "Installing npm dependencies", shell=False)
+    """Install npm dependencies, skipping the install when nothing has changed."""
+    deps_hash = _deps_hash()
+    try:
+        if INSTALL_STAMP_PATH.read_text(encoding="utf-8").strip() == deps_hash:
+            print("\n✅ npm dependencies up to date (cached), skipping install")
+            return True
+    except OSError:
+        pass
+
+    # npm ci skips dependency resolution when a lockfile is present
+    if PACKAGE_LOCK_PATH.exists():
+        cmd = ["npm", "ci"]
+    else:
+        cmd = ["npm", "install"]
+    if not run_command(cmd, "Installing npm dependencies", env=_npm_env()):
+        return False
+
+    # npm install may rewrite the lockfile, so stamp the post-install state
+    try:
+        INSTALL_STAMP_PATH.write_text(_deps_hash(), encoding="utf-8")
+    except OSError as exc:
+        print(f"⚠️  Unable to write install stamp: {exc}")
+    return True
 
 
 def compile_typescript():
-    """Compile TypeScript code."""
-    return run_command(["npm", "run", "compile"], "Compiling TypeScript", shell=False)
+    """Compile TypeScript code, type-checking and linting alongside the build."""
+    return run_commands_parallel(
+        [
+            (["npm", "run", "compile"], "Compiling TypeScript"),
+            (["npm", "run", "check-types"], "Type-checking"),
+            (["npm", "run", "lint"], "Linting"),
+        ],
+        "Compiling, type-checking and linting",
+    )
 
 
 def bundle_with_esbuild():
     """Bundle the extension with esbuild so dist/ assets exist for activation."""
-    return run_command(["npm", "run", "package"], "Bundling extension with esbuild", shell=False)
+    # Type-checking and linting already ran in compile_typescript, so only the
+    # production bundle step of `npm run package` is needed here.
+    return run_command(["node", "esbuild.js", "--production"], "Bundling extension with esbuild")
 
 
 def run_tests():
     """Run tests if available."""
     # Check if test script exists in package.json
     if PACKAGE_JSON_PATH.exists():
-        with open(PACKAGE_JSON_PATH, "r", encoding="utf-8") as f:
-            package_data = json.load(f)
+        package_data = _load_package_json()
 
         scripts = package_data.get("scripts", {})
         if "test" in scripts:
@@ -262,7 +515,6 @@ def package_extension(version, extension_name):
     return run_command(
         ["vsce", "package", "-o", output_name, "--allow-missing-repository"],
         f"Packaging extension as {output_name}",
-        shell=False,
     )
 
 
@@ -311,34 +563,38 @@ def verify_vsix(vsix_path: Path) -> bool:
         return False
 
 
-def prune_vsix_files(keep_latest: int = 2) -> None:
-    """Keep only the most recent VSIX files based on modification time."""
-    vsix_files = sorted(
-        Path(__file__).parent.glob("*.vsix"),
-        key=lambda f: f.stat().st_mtime,
-        reverse=True,
-    )
+def _list_vsix():
+    """List VSIX files as (path, mtime, size) triples, newest first, in a single directory scan."""
+    listing = []
+    with os.scandir(SCRIPT_DIR) as it:
+        for e in it:
+            if e.name.endswith(".vsix") and e.is_file():
+                st = e.stat()
+                listing.append((Path(e.path), st.st_mtime, st.st_size))
+    listing.sort(key=lambda x: x[1], reverse=True)
+    return listing
+
 
-    for old_file in vsix_files[keep_latest:]:
+def prune_vsix_files(listing, keep_latest: int = 2):
+    """Keep only the most recent VSIX files based on modification time, returning the kept entries."""
+    for old_file, _, _ in listing[keep_latest:]:
         try:
             print(f"  Removing older VSIX: {old_file.name}")
             old_file.unlink()
         except OSError as exc:
             print(f"⚠️  Unable to remove {old_file.name}: {exc}")
+    return listing[:keep_latest]
 
 
-def find_vsix_file(preferred: Optional[Path] = None):
-    """Find the generated VSIX file, prioritising the provided path."""
-    if preferred and preferred.exists():
-        return preferred
+def find_vsix_file(listing, preferred: Optional[Path] = None):
+    """Find the generated VSIX entry in the listing, prioritising the provided path."""
+    if preferred:
+        for entry in listing:
+            if entry[0].name == preferred.name:
+                return entry
 
-    vsix_files = sorted(
-        Path(__file__).parent.glob("*.vsix"),
-        key=lambda f: f.stat().st_mtime,
-        reverse=True,
-    )
-    if vsix_files:
-        return vsix_files[0]
+    if listing:
+        return listing[0]
     return None
 
 
@@ -350,11 +606,7 @@ def final_cleanup(keep_build: bool) -> None:
 
     print("\n🧾 Final cleanup: removing temporary build folders...")
     cleanup_dirs = ["dist", "out", "node_modules/.cache"]
-    for d in cleanup_dirs:
-        p = Path(d)
-        if p.exists():
-            print(f"  Removing {d}/")
-            shutil.rmtree(p, ignore_errors=True)
+    _remove_dirs(cleanup_dirs)
 
     print("✅ Final cleanup complete")
     print("   (Development runs will fall back to ts-node when out/ is missing.)")
@@ -362,36 +614,43 @@ def final_cleanup(keep_build: bool) -> None:
 
 def get_package_main() -> Optional[str]:
     try:
-        with open(PACKAGE_JSON_PATH, "r", encoding="utf-8") as f:
-            package_data = json.load(f)
-        return package_data.get("main")
+        return _load_package_json().get("main")
     except (FileNotFoundError, json.JSONDecodeError):
         return None
 
 
 def set_package_main(main_path: str) -> bool:
     try:
-        with open(PACKAGE_JSON_PATH, "r", encoding="utf-8") as f:
-            package_data = json.load(f)
+        package_data = _load_package_json()
         if package_data.get("main") == main_path:
             return True
         package_data["main"] = main_path
-        with open(PACKAGE_JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump(package_data, f, indent=2, ensure_ascii=False)
-            f.write("\n")
+        _atomic_write_json(PACKAGE_JSON_PATH, package_data)
         return True
     except Exception as exc:
         print(f"❌ Failed to update package.json main field: {exc}")
         return False
 
 
+@contextlib.contextmanager
+def _temp_main(main_path: str):
+    """Temporarily point package.json main at main_path, yielding whether the switch succeeded."""
+    original_main = get_package_main()
+    changed = original_main != main_path
+    if changed and not set_package_main(main_path):
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        if changed:
+            set_package_main(original_main or "./out/extension.js")
+
+
 def get_extension_name():
     """Get the extension name from package.json."""
-    package_json_path = Path(__file__).parent / "package.json"
     try:
-        with open(package_json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data.get("name", "extension")
+        return _load_package_json().get("name", "extension")
     except Exception:
         return "extension"
 
@@ -424,17 +683,17 @@ def main(keep_build: bool = False):
             return
 
         # Step 3: Prompt for version update (optional)
-        if not prompt_version_update():
+        version_ok, version = prompt_version_update()
+        if not version_ok:
             print("\n❌ Version update failed!")
             return
 
-        # Step 4: Get dev-time entrypoint and version from package.json
+        # Step 4: Get dev-time entrypoint from package.json
         dev_main = get_package_main()
         if not dev_main:
             print("\n⚠️  Unable to determine current package main entry (package.json missing?)")
             return
 
-        version = get_version()
         print(f"\n📌 Building version: {version}\n")
 
         # Step 5: Install dependencies
@@ -442,9 +701,9 @@ def main(keep_build: bool = False):
             print("\n❌ Failed to install dependencies!")
             return
 
-        # Step 6: Compile TypeScript
+        # Step 6: Compile TypeScript, type-check and lint
         if not compile_typescript():
-            print("\n❌ TypeScript compilation failed!")
+            print("\n❌ Compilation, type-checking or linting failed!")
             return
 
         # Step 7: Run tests
@@ -453,9 +712,8 @@ def main(keep_build: bool = False):
             return
 
         # Step 8: Temporarily point package.json to dist build for packaging
-        original_main = dev_main
-        try:
-            if not set_package_main("./dist/extension.js"):
+        with _temp_main("./dist/extension.js") as switched:
+            if not switched:
                 return
 
             # Step 9: Bundle with esbuild to produce dist/extension.js
@@ -476,22 +734,20 @@ def main(keep_build: bool = False):
                 if expected_vsix.exists():
                     expected_vsix.unlink()
                 return
-        finally:
-            set_package_main(original_main or "./out/extension.js")
 
-        prune_vsix_files(keep_latest=2)
+        vsix_listing = prune_vsix_files(_list_vsix(), keep_latest=2)
 
         success = True
 
         # Step 12: Report success
-        vsix_file = find_vsix_file(preferred=expected_vsix)
-        if vsix_file:
-            size_mb = vsix_file.stat().st_size / (1024 * 1024)
+        vsix_entry = find_vsix_file(vsix_listing, preferred=expected_vsix)
+        if vsix_entry:
+            vsix_file, _, vsix_size = vsix_entry
             print("\n" + "=" * 60)
             print("✨ BUILD SUCCESSFUL!")
             print("=" * 60)
             print("\n📦 VSIX package created:")
-            print(f"  📄 {vsix_file.name} ({size_mb:.2f} MB)")
+            print(f"  📄 {vsix_file.name} ({vsix_size / (1024 * 1024):.2f} MB)")
             print(f"📍 Location: {vsix_file.absolute()}")
             print("\n💡 Next steps:")
             print("  1. Test the VSIX: Install it in VS Code")
@@ -515,6 +771,8 @@ def main(keep_build: bool = False):
 
 if __name__ == "__main__":
     try:
+        import argparse
+
         parser = argparse.ArgumentParser(description="Build and package the VS Code extension.")
         parser.add_argument(
             "--keep-build",